@@ -0,0 +1,24 @@
+"""
+Shared pytest configuration for the integration tests in test.py.
+
+Test daemons log at the level given by $SAND_TEST_RUST_LOG, defaulting to
+warn, since trace logging slows down every request. To get a trace log in
+daemon_stderr-<worker>.log while reproducing a bug, either mark the test with
+`@pytest.mark.debug_trace`, which gives it a daemon of its own logging at trace
+level, or run the whole suite with SAND_TEST_RUST_LOG=trace.
+"""
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--thorough",
+        action="store_true",
+        help="Compare daemon responses with DeepDiff instead of match_shape",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "debug_trace: run this test against its own daemon with RUST_LOG=trace",
+    )
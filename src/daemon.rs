@@ -118,6 +118,20 @@ fn get_fd() -> Option<RawFd> {
         .ok()
 }
 
+/// Get the file descriptor of an already listening socket passed to us in
+/// SAND_SOCKFD. The integration tests use this to bind the socket before
+/// spawning the daemon.
+fn env_sock_fd() -> Option<RawFd> {
+    let fd = std::env::var("SAND_SOCKFD").ok()?;
+    match fd.parse::<RawFd>() {
+        Ok(fd) => Some(fd),
+        Err(err) => {
+            log::error!("Failed to parse SAND_SOCKFD {:?}: {}", fd, err);
+            std::process::exit(1);
+        }
+    }
+}
+
 fn maybe_delete_stale_socket(path: &PathBuf) {
     let meta = match std::fs::symlink_metadata(path) {
         Ok(meta) => meta,
@@ -167,17 +181,18 @@ fn get_socket() -> io::Result<tokio::net::UnixListener> {
         return Ok(listener);
     }
 
+    if let Some(fd) = env_sock_fd() {
+        log::trace!("found fd in SAND_SOCKFD: {}", fd);
+        return listener_from_fd(fd);
+    }
+
     if let Some(fd) = get_fd() {
-        let std_listener: unix::net::UnixListener =
-            unsafe { unix::net::UnixListener::from_raw_fd(fd) };
-        std_listener.set_nonblocking(true)?;
-        let listener = tokio::net::UnixListener::from_std(std_listener)?;
-        return Ok(listener);
+        return listener_from_fd(fd);
     }
 
     log::error!(indoc! {"
         I don't know what socket to listen on!
-        - We didn't get SAND_SOCK_PATH
+        - We didn't get SAND_SOCK_PATH or SAND_SOCKFD
         - Since we didn't get LISTEN_PID or LISTEN_FDS, we're not running in
           systemd socket activation mode.
 
@@ -188,6 +203,13 @@ fn get_socket() -> io::Result<tokio::net::UnixListener> {
     std::process::exit(1);
 }
 
+/// Take ownership of an inherited, already listening socket.
+fn listener_from_fd(fd: RawFd) -> io::Result<tokio::net::UnixListener> {
+    let std_listener: unix::net::UnixListener = unsafe { unix::net::UnixListener::from_raw_fd(fd) };
+    std_listener.set_nonblocking(true)?;
+    tokio::net::UnixListener::from_std(std_listener)
+}
+
 /////////////////////////////////////////////////////////////////////////////////////////
 // Main
 /////////////////////////////////////////////////////////////////////////////////////////
@@ -255,3 +277,31 @@ async fn client_accept_loop(listener: tokio::net::UnixListener, ctx: Arc<DaemonC
         };
     }
 }
+
+#[cfg(test)]
+mod test {
+    use super::*;
+    use std::os::fd::IntoRawFd;
+
+    #[tokio::test]
+    async fn listener_from_inherited_fd() {
+        let sock_name = format!("sand-test-{}.sock", std::process::id());
+        let sock_path = std::env::temp_dir().join(sock_name);
+        let _ = std::fs::remove_file(&sock_path);
+
+        // As the integration tests do: bind before handing over the fd
+        let fd = unix::net::UnixListener::bind(&sock_path)
+            .unwrap()
+            .into_raw_fd();
+        let listener = listener_from_fd(fd).unwrap();
+
+        let (client, accepted) = tokio::join!(
+            tokio::net::UnixStream::connect(&sock_path),
+            listener.accept()
+        );
+        client.unwrap();
+        accepted.unwrap();
+
+        std::fs::remove_file(&sock_path).unwrap();
+    }
+}
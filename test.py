@@ -4,19 +4,33 @@
 Sand integration tests.
 """
 
+import re
 import time
 import socket
 import os
+import signal
 import subprocess
 import json
 import warnings
+from collections import namedtuple
 from contextlib import contextmanager
 from pprint import pformat
 
 import pytest
 from deepdiff import DeepDiff
 
-SOCKET_PATH = "./test.sock"
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    json_loads = json.loads
+
+# Each pytest-xdist worker runs its own daemons, so they need their own sockets
+# and logs.
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
 
 # determine which target to test from env
 target = os.environ.get("SAND_TEST_TARGET", "debug")
@@ -28,6 +42,45 @@ else:
     raise ValueError(f"Unknown target: {target}")
 
 
+SandBinary = namedtuple("SandBinary", ["path", "size", "mtime_ns"])
+
+
+# Files outside src/ whose changes mean the binary needs rebuilding
+BUILD_MANIFESTS = ["Cargo.toml", "Cargo.lock", "pyproject.toml", "setup.py"]
+
+
+def newest_source_mtime_ns():
+    sources = [
+        os.path.join(dirpath, filename)
+        for dirpath, _, filenames in os.walk("src")
+        for filename in filenames
+        if filename.endswith(".rs")
+    ]
+    sources += [path for path in BUILD_MANIFESTS if os.path.exists(path)]
+    return max(os.stat(path).st_mtime_ns for path in sources)
+
+
+@pytest.fixture(scope="session")
+def sand_binary():
+    """
+    Stat the binary under test once. If it's missing or older than the sources,
+    the tests that need it are skipped, or fail in CI and release runs, where
+    skipping would let the suite pass without testing anything.
+    """
+    build_cmd = "cargo build --release" if target == "release" else "cargo build"
+    if target == "release" or os.environ.get("CI"):
+        unusable = pytest.fail
+    else:
+        unusable = pytest.skip
+    try:
+        st = os.stat(BINARY_PATH)
+    except FileNotFoundError:
+        unusable(f"{BINARY_PATH} not found. Run `{build_cmd}` first.")
+    if st.st_mtime_ns < newest_source_mtime_ns():
+        unusable(f"{BINARY_PATH} is older than the sources. Run `{build_cmd}`.")
+    return SandBinary(BINARY_PATH, st.st_size, st.st_mtime_ns)
+
+
 def log(s):
     t = time.strftime("%H:%M:%S")
     print(f"Tests [{t}] {s}")
@@ -47,23 +100,155 @@ def ensure_deleted(path):
 # they should be testable independently
 
 
-@pytest.fixture
-def daemon():
-    ensure_deleted(SOCKET_PATH)
+@pytest.fixture(scope="session")
+def shared_socket_path():
+    return f"./test-{WORKER}.sock"
+
+
+@pytest.fixture(scope="session")
+def trace_socket_path():
+    return f"./test-{WORKER}-trace.sock"
+
+
+@pytest.fixture(scope="session")
+def fresh_socket_path():
+    return f"./test-{WORKER}-fresh.sock"
+
+
+@pytest.fixture(scope="session")
+def path_socket_path():
+    return f"./test-{WORKER}-path.sock"
+
+
+@pytest.fixture(scope="session")
+def daemon_log():
+    """
+    The stderr log shared by every daemon this worker starts.
+    """
+    with open(f"daemon_stderr-{WORKER}.log", "ab", buffering=0) as log_file:
+        yield log_file
+
+
+class SpawnedProcess:
+    """
+    The subset of the `subprocess.Popen` interface we need, for a process
+    started with `os.posix_spawn`.
+    """
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.returncode = None
+
+    def terminate(self):
+        os.kill(self.pid, signal.SIGTERM)
+
+    def wait(self):
+        if self.returncode is None:
+            _, status = os.waitpid(self.pid, 0)
+            self.returncode = os.waitstatus_to_exitcode(status)
+        return self.returncode
+
+
+def inheritable_fds():
+    fds = []
+    for name in os.listdir("/dev/fd"):
+        try:
+            if os.get_inheritable(int(name)):
+                fds.append(int(name))
+        except OSError:
+            # The fd listdir used to read /dev/fd, which is closed by now
+            pass
+    return fds
+
+
+def spawn(args, env, stderr, pass_fds=()):
+    """
+    Start a process with `os.posix_spawn` where available, which avoids
+    forking the test process.
+
+    As with `subprocess.Popen`, the child gets only stdin, stdout, stderr and
+    `pass_fds`, which must be inheritable.
+    """
+    if not hasattr(os, "posix_spawn"):
+        return subprocess.Popen(args, env=env, stderr=stderr, pass_fds=pass_fds)
+    file_actions = [(os.POSIX_SPAWN_DUP2, stderr.fileno(), 2)]
+    file_actions += [
+        (os.POSIX_SPAWN_CLOSE, fd)
+        for fd in inheritable_fds()
+        if fd > 2 and fd not in pass_fds
+    ]
+    pid = os.posix_spawn(args[0], args, env, file_actions=file_actions)
+    return SpawnedProcess(pid)
+
+
+def rust_log(node=None):
+    """
+    The daemon's log level: trace for tests marked `debug_trace`, otherwise
+    $SAND_TEST_RUST_LOG, defaulting to warn.
+    """
+    if node is not None and node.get_closest_marker("debug_trace"):
+        return "trace"
+    return os.environ.get("SAND_TEST_RUST_LOG", "warn")
+
+
+def wait_for_socket(sock_path, timeout=5):
+    """
+    Wait until a daemon that binds its own socket is accepting connections.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(sock_path)
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+@contextmanager
+def run_daemon(binary_path, sock_path, daemon_log, log_level, prebind=True):
+    """
+    Start a daemon listening on `sock_path`.
+
+    By default we bind the socket ourselves and hand it to the daemon with
+    SAND_SOCKFD, so it's accepting connections as soon as the daemon is
+    spawned. With `prebind=False` the daemon binds $SAND_SOCK_PATH itself, as
+    it does outside the tests.
+    """
+    ensure_deleted(sock_path)
     daemon_args = ["daemon"]
-    try:
-        with open("daemon_stderr.log", "w") as daemon_stderr:
-            daemon_proc = subprocess.Popen(
-                [BINARY_PATH] + daemon_args,
+
+    if prebind:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(sock_path)
+            listener.listen(16)
+            fd = listener.fileno()
+            os.set_inheritable(fd, True)
+            daemon_proc = spawn(
+                [binary_path] + daemon_args,
                 env={
-                    "SAND_SOCK_PATH": SOCKET_PATH,
-                    "RUST_LOG": "trace",
+                    "SAND_SOCKFD": str(fd),
+                    "RUST_LOG": log_level,
                 },
-                stderr=daemon_stderr,
+                stderr=daemon_log,
+                pass_fds=(fd,),
             )
-            wait_for_socket(SOCKET_PATH)
-            log(f"Daemon started with PID {daemon_proc.pid}")
-            yield daemon_proc
+    else:
+        daemon_proc = spawn(
+            [binary_path] + daemon_args,
+            env={
+                "SAND_SOCK_PATH": sock_path,
+                "RUST_LOG": log_level,
+            },
+            stderr=daemon_log,
+        )
+    log(f"Daemon started with PID {daemon_proc.pid}")
+    try:
+        if not prebind:
+            wait_for_socket(sock_path)
+        yield daemon_proc
     finally:
         log(f"Terminating daemon with PID {daemon_proc.pid}")
         daemon_proc.terminate()
@@ -72,58 +257,192 @@ def daemon():
         log("Daemon terminated")
 
 
-def wait_for_socket(path, timeout=5):
-    start = time.time()
-    while not os.path.exists(path):
-        elapsed = time.time() - start
-        if elapsed > timeout:
-            raise TimeoutError(f"Socket {path} not created within {timeout}s")
-        time.sleep(0.001)
+RunningDaemon = namedtuple("RunningDaemon", ["proc", "sock_path"])
+
+
+@pytest.fixture(scope="module")
+def shared_daemon(sand_binary, shared_socket_path, daemon_log):
+    """
+    A daemon shared by every test in the module. `clean_timers` resets it
+    between tests.
+    """
+    with run_daemon(
+        sand_binary.path, shared_socket_path, daemon_log, rust_log()
+    ) as daemon_proc:
+        yield RunningDaemon(daemon_proc, shared_socket_path)
+
+
+@pytest.fixture
+def daemon(request, sand_binary, trace_socket_path, daemon_log):
+    """
+    The daemon a test talks to: the shared daemon, or for tests marked
+    `debug_trace`, a daemon of their own logging at trace level.
+    """
+    if not request.node.get_closest_marker("debug_trace"):
+        shared = request.getfixturevalue("shared_daemon")
+        clean_timers(shared.sock_path)
+        yield shared
+        return
+    with run_daemon(
+        sand_binary.path, trace_socket_path, daemon_log, "trace"
+    ) as daemon_proc:
+        yield RunningDaemon(daemon_proc, trace_socket_path)
 
 
-def run_client(sock_path, args):
+@pytest.fixture
+def socket_path(daemon):
+    return daemon.sock_path
+
+
+@pytest.fixture
+def fresh_daemon(request, sand_binary, fresh_socket_path, daemon_log):
+    """
+    A daemon of its own, for tests that depend on state `clean_timers` can't
+    reset, such as the most recently started duration.
+    """
+    with run_daemon(
+        sand_binary.path, fresh_socket_path, daemon_log, rust_log(request.node)
+    ) as daemon_proc:
+        yield daemon_proc
+
+
+@pytest.fixture
+def path_daemon(request, sand_binary, path_socket_path, daemon_log):
+    """
+    A daemon of its own that binds $SAND_SOCK_PATH itself, covering the
+    startup path the other daemons skip by being handed a bound socket.
+    """
+    with run_daemon(
+        sand_binary.path,
+        path_socket_path,
+        daemon_log,
+        rust_log(request.node),
+        prebind=False,
+    ) as daemon_proc:
+        yield daemon_proc
+
+
+@pytest.fixture(autouse=True)
+def log_test_header(request, daemon_log):
+    """
+    Mark the start of each test in the daemon log.
+    """
+    daemon_log.write(b"\n--- test %s ---\n" % request.node.nodeid.encode())
+
+
+def clean_timers(socket_path):
+    """
+    Cancel any timers left over from previous tests on the shared daemon.
+    """
+    with connect(socket_path) as conn:
+        response = msg_and_response("list", conn)
+        for timer in response["ok"]["timers"]:
+            msg_and_response({"canceltimer": timer["id"]}, conn)
+
+        response = msg_and_response("list", conn)
+    assert response == EXPECTED_LIST_NONE, f"Timers leaked:\n{pformat(response)}"
+
+
+def run_client_exec(binary_path, sock_path, args):
+    """
+    Run the real client binary. This is slow (fork + exec + dynamic linking per
+    call), so it's only used to cover the CLI itself. Most tests should talk to
+    the daemon directly with `msg_and_response`.
+    """
     client_proc = subprocess.Popen(
-        [BINARY_PATH] + args,
+        [binary_path] + args,
         env={"SAND_SOCK_PATH": sock_path},
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
     )
-    status = client_proc.wait()
-    stdout = client_proc.stdout.read().decode("utf-8")
-    stderr = client_proc.stderr.read().decode("utf-8")
+    try:
+        out, err = client_proc.communicate(timeout=10)
+    except subprocess.TimeoutExpired:
+        client_proc.kill()
+        client_proc.communicate()
+        raise
+    status = client_proc.returncode
+    stdout = out.decode("utf-8")
+    stderr = err.decode("utf-8")
     if status != 0:
         log(f"Client exited with status {status}")
         log(f"Client stderr:\n{stderr}")
     return {"status": status, "stdout": stdout, "stderr": stderr}
 
 
-class TestClient:
-    def test_list_none(self, daemon):
-        result = run_client(SOCKET_PATH, ["list"])
+class TestCLI:
+    def test_start_format(self, daemon, sand_binary, socket_path):
+        result = run_client_exec(sand_binary.path, socket_path, ["start", "10m"])
+        assert result["status"] == 0, f"Client exited with status {result['status']}"
+        expected_stdout = "Timer #1 created for 00:10:00.000."
+        assert result["stdout"].strip() == expected_stdout
+
+    def test_list_none(self, daemon, sand_binary, socket_path):
+        result = run_client_exec(sand_binary.path, socket_path, ["list"])
         assert result["status"] == 0, f"Client exited with status {result['status']}"
         expected_stdout = "There are currently no timers."
         assert result["stdout"].strip() == expected_stdout
 
-    def test_add(self, daemon):
-        result = run_client(SOCKET_PATH, ["start", "10m"])
+    def test_daemon_binds_sock_path(self, path_daemon, sand_binary, path_socket_path):
+        result = run_client_exec(sand_binary.path, path_socket_path, ["start", "10m"])
         assert result["status"] == 0, f"Client exited with status {result['status']}"
         expected_stdout = "Timer #1 created for 00:10:00.000."
         assert result["stdout"].strip() == expected_stdout
 
 
+class DaemonConnection:
+    """
+    A connection to the daemon. The response reader is kept for the lifetime
+    of the connection, so its buffer is reused across messages.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = sock.makefile("rb", buffering=4096)
+
+    def send(self, msg_bytes):
+        self.sock.sendall(msg_bytes)
+
+    def recv_line(self):
+        # The daemon terminates every response with a newline
+        line = self.reader.readline()
+        if not line.endswith(b"\n"):
+            raise ConnectionError(f"Connection closed mid-response: {line!r}")
+        return line
+
+
 @contextmanager
-def client_socket():
+def connect(sock_path):
     with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_sock:
-        client_sock.connect(SOCKET_PATH)
-        yield client_sock
+        client_sock.connect(sock_path)
+        conn = DaemonConnection(client_sock)
+        with conn.reader:
+            yield conn
+
+
+@pytest.fixture
+def client_socket(daemon, socket_path):
+    """
+    A connection to the shared daemon, held for the duration of a test.
+    """
+    with connect(socket_path) as conn:
+        yield conn
+
 
+def msg_and_response(msg, conn=None, sock_path=None):
+    """
+    Send `msg` to the daemon and return its response.
+
+    Uses `conn` if given, otherwise connects to `sock_path` just for this
+    message.
+    """
+    if conn is None:
+        with connect(sock_path) as conn:
+            return msg_and_response(msg, conn)
 
-def msg_and_response(msg):
-    msg_bytes = bytes(json.dumps(msg) + "\n", encoding="utf-8")
-    with client_socket() as sock:
-        sock.sendall(msg_bytes)
-        resp_bytes = sock.recv(1024)
-    response = json.loads(resp_bytes.decode("utf-8"))
+    msg_bytes = json_dumps(msg) + b"\n"
+    conn.send(msg_bytes)
+    response = json_loads(conn.recv_line())
     return response
 
 
@@ -131,167 +450,181 @@ def msg_and_response(msg):
 # to ignore the specific amount of time elapsed/remaining.
 IGNORE_MILLIS = r".+\['millis'\]$"
 IGNORE_REMAINING = r".+\['remaining'\]$"
+IGNORE_KEY_PATHS = {
+    "millis": re.compile(IGNORE_MILLIS),
+    "remaining": re.compile(IGNORE_REMAINING),
+}
+IGNORE_TIME_KEYS = frozenset({"remaining", "millis"})
+
+# Messages used to set up daemon state
+MSG_START_10M = {"starttimer": {"duration": {"secs": 10 * 60, "nanos": 0}}}
+MSG_START_20M = {"starttimer": {"duration": {"secs": 20 * 60, "nanos": 0}}}
+MSG_START_10M_WITH_MSG = {
+    "starttimer": {
+        "duration": {"secs": 10 * 60, "nanos": 0},
+        "message": "Hello, world!",
+    }
+}
+MSG_PAUSE_1 = {"pausetimer": 1}
+MSG_RESUME_1 = {"resumetimer": 1}
+MSG_CANCEL_1 = {"canceltimer": 1}
+
+# Expected daemon responses, built once rather than in every test.
+EXPECTED_LIST_NONE = {"ok": {"timers": []}}
+EXPECTED_ADD_ID1 = {"ok": {"id": 1}}
+EXPECTED_AGAIN_ID2 = {"ok": {"id": 2, "duration": 600_000}}
+EXPECTED_ONE_RUNNING = {
+    "ok": {
+        "timers": [{"id": 1, "message": None, "state": "Running", "remaining": None}]
+    }
+}
+EXPECTED_ONE_PAUSED = {
+    "ok": {"timers": [{"id": 1, "message": None, "state": "Paused", "remaining": None}]}
+}
+EXPECTED_ONE_RUNNING_MSG = {
+    "ok": {
+        "timers": [
+            {
+                "id": 1,
+                "message": "Hello, world!",
+                "state": "Running",
+                "remaining": None,
+            },
+        ]
+    }
+}
+EXPECTED_TWO_RUNNING = {
+    "ok": {
+        "timers": [
+            {"id": 2, "message": None, "state": "Running", "remaining": None},
+            {"id": 1, "message": None, "state": "Running", "remaining": None},
+        ]
+    }
+}
+
+
+def match_shape(expected, actual, ignore_keys, path="root"):
+    """
+    Check that `actual` matches `expected`, ignoring the values of any dict
+    keys in `ignore_keys`. Lists of timers are compared regardless of order.
 
+    This covers only the response shapes the daemon produces, and is much
+    cheaper than DeepDiff.
 
-class TestDaemon:
-    def test_list_none(self, daemon):
-        response = msg_and_response("list")
-
-        expected_shape = {"ok": {"timers": []}}
-
-        diff = DeepDiff(
-            expected_shape,
-            response,
-            exclude_regex_paths=IGNORE_MILLIS,
-            ignore_order=True,
-        )
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
+    Returns None on a match, otherwise a description of the first mismatch.
+    """
+    if isinstance(expected, dict):
+        if not isinstance(actual, dict):
+            return f"{path}: expected a dict, got {actual!r}"
+        if expected.keys() != actual.keys():
+            return f"{path}: expected keys {sorted(expected)}, got {sorted(actual)}"
+        for key, expected_value in expected.items():
+            if key in ignore_keys:
+                continue
+            actual_value = actual[key]
+            # Sort only when every entry has an id, otherwise compare
+            # unsorted and let the mismatch be reported below.
+            if (
+                key == "timers"
+                and isinstance(actual_value, list)
+                and all(isinstance(t, dict) and "id" in t for t in actual_value)
+            ):
+                expected_value = sorted(expected_value, key=lambda t: t["id"])
+                actual_value = sorted(actual_value, key=lambda t: t["id"])
+            key_path = f"{path}['{key}']"
+            err = match_shape(expected_value, actual_value, ignore_keys, key_path)
+            if err is not None:
+                return err
+        return None
+
+    if isinstance(expected, list):
+        if not isinstance(actual, list):
+            return f"{path}: expected a list, got {actual!r}"
+        if len(expected) != len(actual):
+            return f"{path}: expected {len(expected)} items, got {len(actual)}"
+        for i, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            err = match_shape(expected_item, actual_item, ignore_keys, f"{path}[{i}]")
+            if err is not None:
+                return err
+        return None
+
+    if expected != actual:
+        return f"{path}: expected {expected!r}, got {actual!r}"
+    return None
 
-    def test_add(self, daemon):
-        msg = {"starttimer": {"duration": {"secs": 60, "nanos": 0}}}
-        expected = {"ok": {"id": 1}}
 
-        response = msg_and_response(msg)
-        diff = DeepDiff(expected, response, ignore_order=True)
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
+@pytest.fixture
+def assert_shape(pytestconfig):
+    """
+    Assert that a response matches an expected shape, ignoring the values of
+    `ignore_keys`.
 
-    def test_add_with_message(self, daemon):
-        msg_and_response(
-            {
-                "starttimer": {
-                    "duration": {"secs": 10 * 60, "nanos": 0},
-                    "message": "Hello, world!",
-                }
-            }
-        )
-        response = msg_and_response("list")
-        expected_shape = {
-            "ok": {
-                "timers": [
-                    {
-                        "id": 1,
-                        "message": "Hello, world!",
-                        "state": "Running",
-                        "remaining": None,
-                    },
-                ]
-            }
-        }
-        diff = DeepDiff(
-            expected_shape,
-            response,
-            exclude_regex_paths=IGNORE_REMAINING,
-            ignore_order=True,
-        )
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
-
-    def test_list(self, daemon):
-        msg_and_response({"starttimer": {"duration": {"secs": 10 * 60, "nanos": 0}}})
-        msg_and_response({"starttimer": {"duration": {"secs": 20 * 60, "nanos": 0}}})
-
-        response = msg_and_response("list")
-
-        expected_shape = {
-            "ok": {
-                "timers": [
-                    {"id": 2, "message": None, "state": "Running", "remaining": None},
-                    {"id": 1, "message": None, "state": "Running", "remaining": None},
-                ]
-            }
-        }
-
-        diff = DeepDiff(
-            expected_shape,
-            response,
-            exclude_regex_paths=IGNORE_REMAINING,
-            ignore_order=True,
-        )
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
-
-    def test_pause_resume(self, daemon):
-        run_client(SOCKET_PATH, ["start", "10m"])
-        run_client(SOCKET_PATH, ["pause", "1"])
-
-        response = msg_and_response("list")
-        expected_shape = {
-            "ok": {
-                "timers": [
-                    {"id": 1, "message": None, "state": "Paused", "remaining": None}
-                ]
-            }
-        }
-        diff = DeepDiff(
-            expected_shape,
-            response,
-            exclude_regex_paths=IGNORE_REMAINING,
-            ignore_order=True,
-        )
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
-
-        run_client(SOCKET_PATH, ["resume", "1"])
-
-        response = msg_and_response("list")
-        expected_shape = {
-            "ok": {
-                "timers": [
-                    {"id": 1, "message": None, "state": "Running", "remaining": None}
-                ]
-            }
-        }
-        diff = DeepDiff(
-            expected_shape,
-            response,
-            exclude_regex_paths=IGNORE_REMAINING,
-            ignore_order=True,
-        )
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
-
-    def test_cancel(self, daemon):
-        run_client(SOCKET_PATH, ["start", "10m"])
-        run_client(SOCKET_PATH, ["cancel", "1"])
-
-        response = msg_and_response("list")
-        expected_shape = {"ok": {"timers": []}}
-        diff = DeepDiff(expected_shape, response, ignore_order=True)
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
-
-    def test_cancel_paused(self, daemon):
-        run_client(SOCKET_PATH, ["start", "10m"])
-        run_client(SOCKET_PATH, ["pause", "1"])
-
-        response = msg_and_response("list")
-        expected_shape = {
-            "ok": {
-                "timers": [
-                    {"id": 1, "message": None, "state": "Paused", "remaining": None}
-                ]
-            }
-        }
-        diff = DeepDiff(
-            expected_shape,
-            response,
-            exclude_regex_paths=IGNORE_REMAINING,
-            ignore_order=True,
-        )
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
+    Uses `match_shape`, or DeepDiff when running with --thorough.
+    """
+    thorough = pytestconfig.getoption("thorough")
+
+    def assert_shape(expected, response, ignore_keys=frozenset()):
+        if thorough:
+            diff = DeepDiff(
+                expected,
+                response,
+                exclude_regex_paths=[IGNORE_KEY_PATHS[key] for key in ignore_keys],
+                ignore_order=True,
+            )
+            assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
+        else:
+            err = match_shape(expected, response, ignore_keys)
+            assert err is None, f"Response shape mismatch:\n{err}"
+
+    return assert_shape
+
+
+# (setup messages, expected response to "list" afterwards)
+LIST_SHAPE_CASES = [
+    pytest.param([], EXPECTED_LIST_NONE, id="list_none"),
+    pytest.param(
+        [MSG_START_10M_WITH_MSG], EXPECTED_ONE_RUNNING_MSG, id="add_with_message"
+    ),
+    pytest.param([MSG_START_10M, MSG_START_20M], EXPECTED_TWO_RUNNING, id="list"),
+    pytest.param([MSG_START_10M, MSG_PAUSE_1], EXPECTED_ONE_PAUSED, id="pause"),
+    pytest.param(
+        [MSG_START_10M, MSG_PAUSE_1, MSG_RESUME_1],
+        EXPECTED_ONE_RUNNING,
+        id="pause_resume",
+    ),
+    pytest.param([MSG_START_10M, MSG_CANCEL_1], EXPECTED_LIST_NONE, id="cancel"),
+    pytest.param(
+        [MSG_START_10M, MSG_PAUSE_1, MSG_CANCEL_1],
+        EXPECTED_LIST_NONE,
+        id="cancel_paused",
+    ),
+]
 
-        run_client(SOCKET_PATH, ["cancel", "1"])
 
-        response = msg_and_response("list")
-        expected_shape = {"ok": {"timers": []}}
-        diff = DeepDiff(expected_shape, response, ignore_order=True)
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
+class TestDaemon:
+    @pytest.mark.parametrize("setup_msgs,expected", LIST_SHAPE_CASES)
+    def test_list_shape(
+        self, daemon, client_socket, assert_shape, setup_msgs, expected
+    ):
+        for msg in setup_msgs:
+            msg_and_response(msg, client_socket)
+        response = msg_and_response("list", client_socket)
+        assert_shape(expected, response, IGNORE_TIME_KEYS)
+
+    def test_add(self, daemon, client_socket, assert_shape):
+        msg = {"starttimer": {"duration": {"secs": 60, "nanos": 0}}}
+        response = msg_and_response(msg, client_socket)
+        assert_shape(EXPECTED_ADD_ID1, response)
 
-    def test_again(self, daemon):
-        response = msg_and_response("again")
+    def test_again_none_previously_started(self, fresh_daemon, fresh_socket_path):
+        response = msg_and_response("again", sock_path=fresh_socket_path)
         expected = "nonepreviouslystarted"
         assert response == expected
 
-        run_client(SOCKET_PATH, ["start", "1s"])
-        response = msg_and_response("again")
-        expected_shape = {"ok": {"id": 2, "duration": 1000}}
-        diff = DeepDiff(expected_shape, response, ignore_order=True)
-        assert not diff, f"Response shape mismatch:\n{pformat(diff)}"
+    def test_again(self, daemon, client_socket, assert_shape):
+        msg_and_response(MSG_START_10M, client_socket)
+        response = msg_and_response("again", client_socket)
+        assert_shape(EXPECTED_AGAIN_ID2, response)
 
 
 """
@@ -300,11 +633,12 @@ Hopefully we'll be able to make the warn_threshold the fail_threshold
 """
 
 
+@pytest.mark.xdist_group("single")
 @pytest.mark.skipif(
     target == "debug", reason="Only check executable size in release builds"
 )
-def test_executable_size():
-    exe_size = os.path.getsize(BINARY_PATH)
+def test_executable_size(sand_binary):
+    exe_size = sand_binary.size
     warn_threshold = 8_000_000
     if exe_size > warn_threshold:
         exe_size_mb = exe_size / 1_000_000